@@ -0,0 +1,63 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True
+"""Compiled Huffman bit-packing and decoding kernels
+
+Optional drop-in for the Numba / NumPy paths in main.py. Build in place with:
+
+    cythonize -i huffman_core.pyx
+"""
+
+from libc.stdint cimport int32_t, int64_t, uint8_t
+
+
+def pack_codes(const int64_t[::1] code_val, const int64_t[::1] code_len,
+               const uint8_t[::1] data, uint8_t[::1] out, Py_ssize_t bitpos):
+    """Write the code of every byte of data MSB-first into out, starting at bitpos
+
+    Returns the end bit position, or -1 if the codes do not fit in out.
+    """
+    cdef Py_ssize_t i
+    cdef Py_ssize_t capacity = out.shape[0] << 3
+    cdef int64_t j, value
+    cdef uint8_t s
+
+    for i in range(data.shape[0]):
+        s = data[i]
+        value = code_val[s]
+        if bitpos + code_len[s] > capacity:
+            return -1
+        for j in range(code_len[s] - 1, -1, -1):
+            if (value >> j) & 1:
+                out[bitpos >> 3] |= 0x80 >> (bitpos & 7)
+            bitpos += 1
+    return bitpos
+
+
+def decode_codes(const uint8_t[::1] data, Py_ssize_t nbits, const int32_t[::1] children,
+                 const int32_t[::1] symbol, uint8_t[::1] out):
+    """Walk the flattened tree over the first nbits of data, writing bytes to out
+
+    Returns the number of bytes written, or -1 if the bits lead to a missing
+    child, decode to more bytes than out holds, or stop partway through a code.
+    """
+    cdef Py_ssize_t i
+    cdef Py_ssize_t count = 0
+    cdef int32_t node = 0
+    cdef uint8_t bit
+
+    if nbits > data.shape[0] << 3:
+        return -1
+
+    for i in range(nbits):
+        bit = (data[i >> 3] >> (7 - (i & 7))) & 1
+        node = children[(node << 1) | bit]
+        if node < 0:
+            return -1
+        if symbol[node] >= 0:
+            if count == out.shape[0]:
+                return -1
+            out[count] = <uint8_t>symbol[node]
+            count += 1
+            node = 0
+    if node != 0:
+        return -1
+    return count
@@ -1,72 +1,118 @@
 import streamlit as st
-import pickle
+import numpy as np
+import struct
+import array
+import heapq
 from collections import Counter
 from typing import Optional, Dict, Tuple
 import io
+import zlib
 
+try:
+    import huffman_core
+except ImportError:  # optional compiled kernels, built with `cythonize -i huffman_core.pyx`
+    huffman_core = None
 
-class MinHeap:
-    """Min Heap implementation for Huffman encoding"""
-    
-    def __init__(self):
-        self.heap = []
-    
-    def parent(self, i: int) -> int:
-        return (i - 1) // 2
-    
-    def left_child(self, i: int) -> int:
-        return 2 * i + 1
-    
-    def right_child(self, i: int) -> int:
-        return 2 * i + 2
-    
-    def swap(self, i: int, j: int):
-        self.heap[i], self.heap[j] = self.heap[j], self.heap[i]
-    
-    def insert(self, item):
-        self.heap.append(item)
-        self._heapify_up(len(self.heap) - 1)
-    
-    def _heapify_up(self, i: int):
-        parent = self.parent(i)
-        if i > 0 and self.heap[i].freq < self.heap[parent].freq:
-            self.swap(i, parent)
-            self._heapify_up(parent)
+try:
+    import numba
+except ImportError:  # optional JIT; the NumPy / pure-Python paths are used instead
+    numba = None
+
+try:
+    import zstandard
+except ImportError:  # optional; FastCompressor falls back to zlib
+    zstandard = None
+
+
+# Number of bits the decoder resolves per table lookup
+DECODE_TABLE_BITS = 12
+
+# Uploads below this size are compressed in memory; larger ones are streamed
+SMALL_FILE_BYTES = 1 << 20
+
+# Characters of the uploaded file shown in the preview
+PREVIEW_CHARS = 500
+
+# Results kept by each Streamlit cache; entries are shared by all sessions
+CACHE_ENTRIES = 8
+
+# FastCompressor output prefixes. A .huff header starts with its padding (0-7),
+# so these never collide with Huffman output.
+ZSTD_MAGIC = b'ZSTD'
+ZLIB_MAGIC = b'ZLIB'
+
+# Raised when a .huff payload does not decode to exactly its stored length
+CORRUPT_DATA = "corrupt .huff data: decoded length does not match the header"
+
+# Raised when the data to pack no longer matches the frequencies it was sized from
+INPUT_CHANGED = "input changed between the counting and encoding passes"
+
+# .huff layout: header, one entry per symbol, packed data. Codes are canonical,
+# so only their lengths are stored.
+HEADER_FORMAT = '>BHQ'   # padding, number of symbols, original length in bytes
+ENTRY_FORMAT = '>BB'     # byte value, code length in bits
+
+
+def _pack_codes(code_val, code_len, data, out, bitpos):
+    """Write the code of every byte of data MSB-first into out, starting at bitpos
     
-    def extract_min(self):
-        if len(self.heap) == 0:
-            return None
-        if len(self.heap) == 1:
-            return self.heap.pop()
-        
-        min_item = self.heap[0]
-        self.heap[0] = self.heap.pop()
-        self._heapify_down(0)
-        return min_item
+    Returns the end bit position, or -1 if the codes do not fit in out.
+    """
+    capacity = out.shape[0] << 3
+    for i in range(data.shape[0]):
+        s = data[i]
+        value = code_val[s]
+        if bitpos + code_len[s] > capacity:
+            return -1
+        for j in range(code_len[s] - 1, -1, -1):
+            if (value >> j) & 1:
+                out[bitpos >> 3] |= 0x80 >> (bitpos & 7)
+            bitpos += 1
+    return bitpos
+
+
+def _decode_codes(data, nbits, children, symbol, out):
+    """Walk the flattened tree over the first nbits of data, writing bytes to out
     
-    def _heapify_down(self, i: int):
-        min_idx = i
-        left = self.left_child(i)
-        right = self.right_child(i)
-        
-        if left < len(self.heap) and self.heap[left].freq < self.heap[min_idx].freq:
-            min_idx = left
-        if right < len(self.heap) and self.heap[right].freq < self.heap[min_idx].freq:
-            min_idx = right
-        
-        if min_idx != i:
-            self.swap(i, min_idx)
-            self._heapify_down(min_idx)
+    Returns the number of bytes written, or -1 if the bits lead to a missing
+    child, decode to more bytes than out holds, or stop partway through a code.
+    """
+    if nbits > data.shape[0] << 3:
+        return -1
     
-    def size(self) -> int:
-        return len(self.heap)
+    node = 0
+    count = 0
+    for i in range(nbits):
+        bit = (data[i >> 3] >> (7 - (i & 7))) & 1
+        node = children[(node << 1) | bit]
+        if node < 0:
+            return -1
+        if symbol[node] >= 0:
+            if count == out.shape[0]:
+                return -1
+            out[count] = symbol[node]
+            count += 1
+            node = 0
+    if node != 0:
+        return -1
+    return count
+
+
+if huffman_core is not None:
+    _pack_kernel = huffman_core.pack_codes
+    _decode_kernel = huffman_core.decode_codes
+elif numba is not None:
+    _pack_kernel = numba.njit(cache=True)(_pack_codes)
+    _decode_kernel = numba.njit(cache=True)(_decode_codes)
+else:
+    _pack_kernel = _decode_kernel = None
 
 
 class HuffmanNode:
     """Node for Huffman tree"""
     
-    def __init__(self, char: Optional[str], freq: int):
-        self.char = char
+    def __init__(self, byte: Optional[int], freq: int):
+        self.byte = byte
         self.freq = freq
         self.left = None
         self.right = None
@@ -77,77 +123,234 @@ class HuffmanEncoder:
     
     def __init__(self):
         self.root = None
-        self.codes = {}
+        self.codes: Dict[int, Tuple[int, int]] = {}
+        # codes as a list indexed by byte value, (0, 0) for absent bytes,
+        # and as int64 value/length arrays for the packing kernels
+        self.code_table = [(0, 0)] * 256
+        self.code_values = np.zeros(256, dtype=np.int64)
+        self.code_lengths = np.zeros(256, dtype=np.int64)
+        # Flattened tree: children[2 * i + bit] is the child of node i for that bit,
+        # symbol[i] its byte value; -1 for none
+        self.children = array.array('i')
+        self.symbol = array.array('i')
     
-    def build_tree(self, text: str) -> HuffmanNode:
-        """Build Huffman tree from text"""
-        if not text:
+    def build_tree(self, freq_map: Dict[int, int]) -> HuffmanNode:
+        """Build Huffman tree from byte frequencies"""
+        if not freq_map:
             return None
         
-        # Count character frequencies
-        freq_map = Counter(text)
+        # Create min heap of (freq, tiebreaker, node) so nodes are never compared
+        heap = [(freq, i, HuffmanNode(byte, freq)) for i, (byte, freq) in enumerate(freq_map.items())]
+        heapq.heapify(heap)
+        next_id = len(heap)
         
-        # Create min heap
-        heap = MinHeap()
-        for char, freq in freq_map.items():
-            heap.insert(HuffmanNode(char, freq))
-        
-        # Build tree
-        while heap.size() > 1:
-            left = heap.extract_min()
-            right = heap.extract_min()
+        # Build tree; the second minimum is replaced in place by the merged node,
+        # so each merge costs one pop and one sift instead of two pops and a push
+        while len(heap) > 1:
+            left_freq, _, left = heapq.heappop(heap)
+            right_freq, _, right = heap[0]
             
-            merged = HuffmanNode(None, left.freq + right.freq)
+            merged = HuffmanNode(None, left_freq + right_freq)
             merged.left = left
             merged.right = right
             
-            heap.insert(merged)
+            heapq.heapreplace(heap, (merged.freq, next_id, merged))
+            next_id += 1
         
-        self.root = heap.extract_min()
+        self.root = heap[0][2]
         return self.root
     
-    def _generate_codes(self, node: HuffmanNode, code: str = ""):
-        """Generate Huffman codes for each character"""
+    def _generate_codes(self, node: HuffmanNode):
+        """Generate Huffman codes for each byte value as (value, bit length) pairs"""
         if node is None:
             return
         
-        if node.char is not None:
-            self.codes[node.char] = code if code else "0"
-            return
-        
-        self._generate_codes(node.left, code + "0")
-        self._generate_codes(node.right, code + "1")
+        stack = [(node, 0, 0)]
+        while stack:
+            node, value, nbits = stack.pop()
+            if node.byte is not None:
+                self.codes[node.byte] = (value, nbits or 1)
+                continue
+            stack.append((node.right, (value << 1) | 1, nbits + 1))
+            stack.append((node.left, value << 1, nbits + 1))
     
-    def encode(self, text: str) -> Tuple[str, Dict[str, str]]:
-        """Encode text using Huffman coding"""
-        if not text:
-            return "", {}
+    def _assign_canonical_codes(self, lengths: Dict[int, int]):
+        """Assign canonical Huffman codes from code lengths alone"""
+        self.codes = {}
+        code = 0
+        prev_len = 0
+        for byte, n in sorted(lengths.items(), key=lambda item: (item[1], item[0])):
+            code <<= n - prev_len
+            self.codes[byte] = (code, n)
+            code += 1
+            prev_len = n
         
-        self.build_tree(text)
+        self.code_table = [(0, 0)] * 256
+        for byte, entry in self.codes.items():
+            self.code_table[byte] = entry
+        table = np.array(self.code_table, dtype=np.int64)
+        self.code_values = np.ascontiguousarray(table[:, 0])
+        self.code_lengths = np.ascontiguousarray(table[:, 1])
+    
+    def build_codes(self, freq_map: Dict[int, int]):
+        """Build the tree and canonical code tables from byte frequencies"""
+        self.build_tree(freq_map)
         self._generate_codes(self.root)
+        self._assign_canonical_codes({byte: n for byte, (_, n) in self.codes.items()})
+    
+    def encoded_bits(self, freq_map: Dict[int, int]) -> int:
+        """Exact encoded size in bits of data with these byte frequencies"""
+        return sum(freq * self.code_table[byte][1] for byte, freq in freq_map.items())
+    
+    def packed_bits(self, data: bytes) -> int:
+        """Exact encoded size in bits of data; every byte must have a code"""
+        lens = self.code_lengths[np.frombuffer(data, dtype=np.uint8)]
+        if not lens.all():
+            raise ValueError(INPUT_CHANGED)
+        return int(lens.sum())
+    
+    def pack_into(self, data: bytes, out: bytearray, bitpos: int) -> int:
+        """Pack the codes of data MSB-first into zeroed out from bitpos; return the end bitpos"""
+        code_bits = self.code_values
+        code_len = self.code_lengths
+        idx = np.frombuffer(data, dtype=np.uint8)
+        view = np.frombuffer(out, dtype=np.uint8)
+        
+        if _pack_kernel is not None:
+            end = _pack_kernel(code_bits, code_len, idx, view, bitpos)
+            if end < 0:
+                raise ValueError(INPUT_CHANGED)
+            return end
+        
+        # Map every byte to its code length and value
+        lens = code_len[idx]
+        vals = code_bits[idx]
+        lead = bitpos & 7
+        offsets = np.cumsum(lens) - lens + lead
+        nbits = lead + int(lens.sum())
+        
+        # Scatter one bit position of every code per pass, MSB first. The lead bits
+        # stay zero, so OR-ing the packed bytes keeps what out already holds there.
+        bits = np.zeros(nbits, dtype=np.uint8)
+        for j in range(int(code_len.max())):
+            mask = lens > j
+            bits[offsets[mask] + j] = (vals[mask] >> (lens[mask] - 1 - j)) & 1
+        packed = np.packbits(bits)
+        
+        start = bitpos >> 3
+        if start + len(packed) > len(view):
+            raise ValueError(INPUT_CHANGED)
+        view[start:start + len(packed)] |= packed
+        return bitpos + nbits - lead
+    
+    def _rebuild_tree(self):
+        """Rebuild the children/symbol arrays (root at 0) from self.codes"""
+        self.children = array.array('i', [-1, -1])
+        self.symbol = array.array('i', [-1])
         
-        encoded = "".join(self.codes[char] for char in text)
-        return encoded, self.codes
+        for byte, (value, n) in self.codes.items():
+            node = 0
+            for shift in range(n - 1, -1, -1):
+                slot = (node << 1) | ((value >> shift) & 1)
+                if self.children[slot] < 0:
+                    self.children[slot] = len(self.symbol)
+                    self.children.extend((-1, -1))
+                    self.symbol.append(-1)
+                node = self.children[slot]
+            self.symbol[node] = byte
     
-    def decode(self, encoded: str, root: HuffmanNode) -> str:
-        """Decode encoded text using Huffman tree"""
-        if not encoded or root is None:
-            return ""
+    def _build_decode_table(self) -> Tuple[list, list]:
+        """Map every DECODE_TABLE_BITS-bit window to the (symbol, length) of its leading code"""
+        size = 1 << DECODE_TABLE_BITS
+        symbols = [None] * size
+        lengths = [0] * size
         
-        decoded = []
-        current = root
+        for byte, (value, n) in self.codes.items():
+            if n > DECODE_TABLE_BITS:
+                continue  # resolved by walking the tree
+            base = value << (DECODE_TABLE_BITS - n)
+            for suffix in range(1 << (DECODE_TABLE_BITS - n)):
+                symbols[base | suffix] = byte
+                lengths[base | suffix] = n
         
-        for bit in encoded:
-            if bit == "0":
-                current = current.left
+        return symbols, lengths
+    
+    def decode(self, data: bytes, nbits: int, length: int) -> bytes:
+        """Decode the first nbits of packed data into length bytes using the flattened tree"""
+        if not nbits or not self.symbol:
+            if length:
+                raise ValueError(CORRUPT_DATA)
+            return b""
+        
+        children, symbol = self.children, self.symbol
+        
+        if _decode_kernel is not None:
+            out = np.empty(length, dtype=np.uint8)
+            count = _decode_kernel(np.frombuffer(data, dtype=np.uint8), nbits,
+                                   np.frombuffer(children, dtype=np.intc),
+                                   np.frombuffer(symbol, dtype=np.intc), out)
+            if count != length:
+                raise ValueError(CORRUPT_DATA)
+            return out.tobytes()
+        
+        symbols, lengths = self._build_decode_table()
+        
+        k = DECODE_TABLE_BITS
+        window_mask = (1 << k) - 1
+        out = bytearray(length)
+        count = 0
+        acc = 0        # bit buffer, holds navail unread bits
+        navail = 0
+        pos = 0
+        remaining = nbits
+        
+        while remaining > 0:
+            if count == length:
+                raise ValueError(CORRUPT_DATA)
+            
+            # Refill up to 64 bits at a time so the next k bits are available
+            if navail < k and pos < len(data):
+                chunk = data[pos:pos + 8]
+                acc = (acc << (len(chunk) << 3)) | int.from_bytes(chunk, 'big')
+                pos += len(chunk)
+                navail += len(chunk) << 3
+            
+            if navail >= k:
+                window = (acc >> (navail - k)) & window_mask
             else:
-                current = current.right
+                window = (acc << (k - navail)) & window_mask
             
-            if current.char is not None:
-                decoded.append(current.char)
-                current = root
+            n = lengths[window]
+            if n:
+                out[count] = symbols[window]
+            else:
+                # Code longer than the table; walk the tree bit by bit
+                node = 0
+                n = 0
+                while symbol[node] < 0:
+                    if n == navail:
+                        if pos == len(data):
+                            raise ValueError(CORRUPT_DATA)
+                        acc = (acc << 8) | data[pos]
+                        pos += 1
+                        navail += 8
+                    n += 1
+                    bit = (acc >> (navail - n)) & 1
+                    node = children[(node << 1) | bit]
+                    if node < 0:
+                        raise ValueError(CORRUPT_DATA)
+                out[count] = symbol[node]
+            
+            if n > remaining:
+                raise ValueError(CORRUPT_DATA)
+            count += 1
+            navail -= n
+            remaining -= n
+            acc &= (1 << navail) - 1
         
-        return "".join(decoded)
+        if count != length:
+            raise ValueError(CORRUPT_DATA)
+        return bytes(out)
 
 
 class FileCompressor:
@@ -156,47 +359,147 @@ class FileCompressor:
     def __init__(self):
         self.encoder = HuffmanEncoder()
     
-    def compress(self, text: str) -> bytes:
-        """Compress text and return binary data"""
-        encoded_text, codes = self.encoder.encode(text)
+    def compress(self, raw: bytes) -> bytearray:
+        """Compress raw bytes into one exactly sized buffer"""
+        freq_map = Counter(raw)
+        if freq_map:
+            self.encoder.build_codes(freq_map)
+        nbits = self.encoder.encoded_bits(freq_map)
+        header = self._header((-nbits) & 7, len(raw))
         
-        # Convert binary string to bytes
-        padding = 8 - len(encoded_text) % 8
-        encoded_text += "0" * padding
+        # Count and encode over the same contiguous buffer while it is in cache
+        out = bytearray(len(header) + ((nbits + 7) >> 3))
+        out[:len(header)] = header
+        self.encoder.pack_into(raw, out, len(header) << 3)
+        return out
+    
+    def compress_stream(self, file_obj, out_buf, chunk_size: int = 1 << 20):
+        """Compress a seekable binary file into out_buf, reading chunk_size bytes at a time"""
+        # Pass 1: count byte frequencies
+        freq_map = Counter()
+        for chunk in iter(lambda: file_obj.read(chunk_size), b''):
+            freq_map.update(chunk)
+        file_obj.seek(0)
         
-        byte_array = bytearray()
-        for i in range(0, len(encoded_text), 8):
-            byte = encoded_text[i:i+8]
-            byte_array.append(int(byte, 2))
+        if freq_map:
+            self.encoder.build_codes(freq_map)
+        nbits = self.encoder.encoded_bits(freq_map)
+        out_buf.write(self._header((-nbits) & 7, sum(freq_map.values())))
         
-        # Store tree and padding info
-        compressed_data = {
-            'tree': self.encoder.root,
-            'data': bytes(byte_array),
-            'padding': padding,
-            'original_length': len(text)
-        }
+        # Pass 2: pack each chunk behind the carried partial byte and write out
+        # every completed byte before reading the next chunk
+        carry = carry_bits = 0
+        written = 0
+        for chunk in iter(lambda: file_obj.read(chunk_size), b''):
+            buf = bytearray((carry_bits + self.encoder.packed_bits(chunk) + 7) >> 3)
+            if carry_bits:
+                buf[0] = carry
+            bitpos = self.encoder.pack_into(chunk, buf, carry_bits)
+            written += bitpos - carry_bits
+            
+            whole = bitpos >> 3
+            out_buf.write(memoryview(buf)[:whole])
+            carry_bits = bitpos & 7
+            carry = buf[whole] if carry_bits else 0
+        if carry_bits:
+            out_buf.write(bytes([carry]))
         
-        return pickle.dumps(compressed_data)
+        if written != nbits:
+            raise ValueError(INPUT_CHANGED)
     
-    def decompress(self, compressed: bytes) -> str:
-        """Decompress binary data back to text"""
-        compressed_data = pickle.loads(compressed)
+    def _header(self, padding: int, original_length: int) -> bytes:
+        """Header followed by the code length of every symbol"""
+        header = bytearray(struct.pack(HEADER_FORMAT, padding, len(self.encoder.codes), original_length))
+        for byte, (_, n) in self.encoder.codes.items():
+            header += struct.pack(ENTRY_FORMAT, byte, n)
+        return bytes(header)
+    
+    def decompress(self, compressed: bytes) -> bytes:
+        """Decompress binary data back to the original bytes"""
+        offset = struct.calcsize(HEADER_FORMAT)
+        entry_size = struct.calcsize(ENTRY_FORMAT)
+        if len(compressed) < offset:
+            raise ValueError("corrupt .huff header: file is too short")
+        padding, num_symbols, original_length = struct.unpack_from(HEADER_FORMAT, compressed)
+        if padding > 7:
+            raise ValueError("corrupt .huff header: padding must be below 8 bits")
+        if len(compressed) < offset + num_symbols * entry_size:
+            raise ValueError("corrupt .huff header: file is too short")
         
-        tree = compressed_data['tree']
-        data = compressed_data['data']
-        padding = compressed_data['padding']
+        lengths = {}
+        for _ in range(num_symbols):
+            byte, n = struct.unpack_from(ENTRY_FORMAT, compressed, offset)
+            offset += entry_size
+            # Codes are held in int64 arrays, so no code may exceed 63 bits
+            if n == 0 or n > 63 or byte in lengths:
+                raise ValueError("corrupt .huff header: invalid code table entry")
+            lengths[byte] = n
         
-        # Convert bytes back to binary string
-        bit_string = ""
-        for byte in data:
-            bit_string += format(byte, '08b')
+        # Code lengths must satisfy the Kraft inequality to form a prefix code
+        if lengths:
+            max_len = max(lengths.values())
+            if sum(1 << (max_len - n) for n in lengths.values()) > 1 << max_len:
+                raise ValueError("corrupt .huff header: code lengths do not form a prefix code")
         
-        # Remove padding
-        bit_string = bit_string[:-padding] if padding else bit_string
+        self.encoder._assign_canonical_codes(lengths)
+        self.encoder._rebuild_tree()
+        data = memoryview(compressed)[offset:]
+        nbits = len(data) * 8 - padding
+        # Every decoded byte takes at least one bit, so check before allocating the output
+        if original_length > nbits:
+            raise ValueError(CORRUPT_DATA)
         
         # Decode
-        return self.encoder.decode(bit_string, tree)
+        return self.encoder.decode(data, nbits, original_length)
+
+
+class FastCompressor:
+    """General-purpose compression using zstd, or zlib if zstandard is not installed"""
+    
+    name = "zstd" if zstandard is not None else "zlib"
+    
+    @staticmethod
+    def is_compressed(data: bytes) -> bool:
+        """Whether data was produced by FastCompressor"""
+        return data[:4] in (ZSTD_MAGIC, ZLIB_MAGIC)
+    
+    def compress(self, raw: bytes) -> bytes:
+        """Compress raw bytes and return binary data"""
+        if zstandard is not None:
+            return ZSTD_MAGIC + zstandard.ZstdCompressor(level=9).compress(raw)
+        return ZLIB_MAGIC + zlib.compress(raw, 6)
+    
+    def decompress(self, compressed: bytes) -> bytes:
+        """Decompress binary data back to the original bytes"""
+        magic, payload = compressed[:4], compressed[4:]
+        if magic == ZLIB_MAGIC:
+            return zlib.decompress(payload)
+        if magic == ZSTD_MAGIC:
+            if zstandard is None:
+                raise ValueError("the zstandard package is required to decompress this file")
+            return zstandard.ZstdDecompressor().decompress(payload)
+        raise ValueError("not a FastCompressor file")
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_ENTRIES)
+def _compress_cached(uploaded_file, fast: bool) -> bytes:
+    """Compress an uploaded file, cached across Streamlit re-runs on its contents"""
+    if fast:
+        return FastCompressor().compress(uploaded_file.getvalue())
+    if uploaded_file.size < SMALL_FILE_BYTES:
+        # download_button needs bytes, not the bytearray compress fills
+        return bytes(FileCompressor().compress(uploaded_file.getvalue()))
+    out_buf = io.BytesIO()
+    FileCompressor().compress_stream(uploaded_file, out_buf)
+    return out_buf.getvalue()
+
+
+@st.cache_data(show_spinner=False, max_entries=CACHE_ENTRIES)
+def _decompress_cached(compressed: bytes) -> bytes:
+    """Decompress .huff data, cached across Streamlit re-runs"""
+    if FastCompressor.is_compressed(compressed):
+        return FastCompressor().decompress(compressed)
+    return FileCompressor().decompress(compressed)
 
 
 # Streamlit UI
@@ -212,20 +515,23 @@ def main():
     with tab1:
         st.write("Upload a text file to compress it using Huffman encoding")
         
+        method = st.radio("Method", ["Huffman (educational)", f"{FastCompressor.name} (fast)"], horizontal=True)
+        
         uploaded_file = st.file_uploader("Choose a text file", type=['txt'], key="compress")
         
         if uploaded_file is not None:
-            # Read file
-            text = uploaded_file.read().decode('utf-8')
-            original_size = len(text.encode('utf-8'))
+            # Read just enough for the preview; large files are compressed in chunks
+            original_size = uploaded_file.size
+            head = uploaded_file.read(PREVIEW_CHARS * 4)
+            preview = head.decode('utf-8', errors='ignore')[:PREVIEW_CHARS]
+            uploaded_file.seek(0)
             
             st.success(f"File uploaded: {uploaded_file.name}")
             st.info(f"Original size: {original_size:,} bytes")
             
             # Compress
             with st.spinner("Compressing..."):
-                compressor = FileCompressor()
-                compressed_data = compressor.compress(text)
+                compressed_data = _compress_cached(uploaded_file, method != "Huffman (educational)")
                 compressed_size = len(compressed_data)
             
             # Show results
@@ -251,7 +557,7 @@ def main():
             
             # Preview
             with st.expander("Preview original text (first 500 characters)"):
-                st.text(text[:500] + ("..." if len(text) > 500 else ""))
+                st.text(preview + ("..." if original_size > len(preview.encode('utf-8')) else ""))
     
     # Decompression tab
     with tab2:
@@ -269,9 +575,9 @@ def main():
             # Decompress
             with st.spinner("Decompressing..."):
                 try:
-                    compressor = FileCompressor()
-                    decompressed_text = compressor.decompress(compressed_data)
-                    decompressed_size = len(decompressed_text.encode('utf-8'))
+                    decompressed = _decompress_cached(compressed_data)
+                    decompressed_size = len(decompressed)
+                    preview = decompressed[:PREVIEW_CHARS * 4].decode('utf-8', errors='ignore')[:PREVIEW_CHARS]
                     
                     st.success("Decompression successful!")
                     
@@ -285,7 +591,7 @@ def main():
                     original_name = compressed_file.name.replace('.huff', '')
                     st.download_button(
                         label="⬇️ Download Decompressed File",
-                        data=decompressed_text,
+                        data=decompressed,
                         file_name=original_name,
                         mime="text/plain"
                     )
@@ -294,7 +600,7 @@ def main():
                     
                     # Preview
                     with st.expander("Preview decompressed text (first 500 characters)"):
-                        st.text(decompressed_text[:500] + ("..." if len(decompressed_text) > 500 else ""))
+                        st.text(preview + ("..." if decompressed_size > len(preview.encode('utf-8')) else ""))
                 
                 except Exception as e:
                     st.error(f"Error decompressing file: {str(e)}")